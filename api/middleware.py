@@ -0,0 +1,40 @@
+import logging
+from fastapi.responses import ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+class ConcurrencyLimitMiddleware:
+    """
+    Middleware ASGI que limita las peticiones HTTP en curso.
+    
+    Por encima de `max_concurrent` responde 429 con `Retry-After` en lugar de
+    encolar más trabajo sobre el pool de BD y los batchers.
+    """
+    
+    def __init__(self, app, max_concurrent: int = 200, retry_after: int = 1):
+        self.app = app
+        self.max_concurrent = max_concurrent
+        self.retry_after = str(retry_after)
+        self._in_flight = 0
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.max_concurrent <= 0:
+            await self.app(scope, receive, send)
+            return
+        
+        # Un único event loop: comprobar e incrementar sin `await` en medio es atómico
+        if self._in_flight >= self.max_concurrent:
+            logger.warning(f"Límite de concurrencia alcanzado ({self.max_concurrent}), respondiendo 429")
+            response = ORJSONResponse(
+                status_code=429,
+                content={"detail": "Servidor ocupado, intente de nuevo"},
+                headers={"Retry-After": self.retry_after}
+            )
+            await response(scope, receive, send)
+            return
+        
+        self._in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._in_flight -= 1
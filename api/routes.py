@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
@@ -6,21 +7,21 @@ import logging
 
 from models.schemas import ContactCreate, ContactResponse, ContactStats
 from models.database import ContactDB
-from services.classifier import MessageClassifier
-from services.automation import AutomationService
-from database.connection import get_db
+from services.singletons import (
+    classifier, batch_classifier, contact_writer, automation_service,
+    stats_cache, classification_cache
+)
+from services.cache import message_key
+from database.connection import get_db, check_database_connection
+from database import crud
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Servicios
-classifier = MessageClassifier()
-automation_service = AutomationService()
-
 @router.post("/contact", response_model=ContactResponse, status_code=201)
 async def create_contact(
     contact: ContactCreate,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks
 ):
     """
     Endpoint para recibir y procesar nuevos mensajes de contacto.
@@ -29,44 +30,39 @@ async def create_contact(
     1. Valida los datos de entrada con Pydantic
     2. Clasifica el mensaje automáticamente con IA
     3. Almacena en base de datos
-    4. Ejecuta automatizaciones según la categoría
+    4. Programa las automatizaciones según la categoría (se ejecutan tras enviar la respuesta)
     
     Returns:
         ContactResponse: Datos del contacto creado con categoría asignada
     """
     try:
         # 1. Clasificar mensaje con IA
-        categoria = classifier.classify_message(contact.mensaje)
+        categoria = await batch_classifier.submit(contact.mensaje)
         logger.info(f"Mensaje clasificado como: {categoria}")
         
-        # 2. Crear registro en base de datos
-        db_contact = ContactDB(
-            nombre=contact.nombre,
-            email=contact.email,
-            mensaje=contact.mensaje,
-            categoria=categoria
-        )
+        # 2. Crear registro en base de datos (INSERT agrupado con otros requests)
+        db_contact = await contact_writer.submit({
+            "nombre": contact.nombre,
+            "email": contact.email,
+            "mensaje": contact.mensaje,
+            "categoria": categoria
+        })
         
-        db.add(db_contact)
-        db.commit()
-        db.refresh(db_contact)
+        stats_cache.delete("category_counts")
         
-        # 3. Ejecutar automatización en background
-        automation_result = await automation_service.execute_automation(db_contact)
-        logger.info(f"Automatización: {automation_result}")
+        # 3. Ejecutar automatización en background, sin retrasar la respuesta
+        background_tasks.add_task(automation_service.execute_automation, db_contact)
         
         logger.info(f"Contacto {db_contact.id} procesado exitosamente - {categoria}")
         return db_contact
         
     except Exception as e:
-        if db:
-            db.rollback()
         error_msg = f"Error procesando contacto: {str(e)}"
         logger.error(f"{error_msg}")
         raise HTTPException(status_code=500, detail=error_msg)
 
 @router.get("/contacts", response_model=List[ContactResponse])
-async def get_contacts(
+def get_contacts(
     categoria: Optional[str] = Query(
         None, 
         description="Filtrar por categoría: ventas, soporte, otro",
@@ -105,7 +101,8 @@ async def get_contacts(
         query = db.query(ContactDB)
         
         if categoria:
-            query = query.filter(ContactDB.categoria == categoria.lower())
+            # El validador de Query solo acepta valores en minúsculas
+            query = query.filter(ContactDB.categoria == categoria)
             logger.info(f"Filtro aplicado: categoria={categoria}")
         
         contacts = query.order_by(ContactDB.fecha_creacion.desc())\
@@ -122,7 +119,7 @@ async def get_contacts(
         raise HTTPException(status_code=500, detail=error_msg)
 
 @router.get("/contacts/{contact_id}", response_model=ContactResponse)
-async def get_contact(contact_id: int, db: Session = Depends(get_db)):
+def get_contact(contact_id: int, db: Session = Depends(get_db)):
     """
     Obtener un contacto específico por ID
     
@@ -135,7 +132,7 @@ async def get_contact(contact_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: 404 si el contacto no existe
     """
-    contact = db.query(ContactDB).filter(ContactDB.id == contact_id).first()
+    contact = db.get(ContactDB, contact_id)
     if not contact:
         raise HTTPException(status_code=404, detail="Contacto no encontrado")
     
@@ -143,7 +140,7 @@ async def get_contact(contact_id: int, db: Session = Depends(get_db)):
     return contact
 
 @router.get("/stats", response_model=ContactStats)
-async def get_stats(db: Session = Depends(get_db)):
+def get_stats(db: Session = Depends(get_db)):
     """
     Obtener estadísticas del sistema de contactos
     
@@ -151,17 +148,16 @@ async def get_stats(db: Session = Depends(get_db)):
         ContactStats: Estadísticas generales y por categoría
     """
     try:
-        total = db.query(ContactDB).count()
-        ventas = db.query(ContactDB).filter(ContactDB.categoria == "ventas").count()
-        soporte = db.query(ContactDB).filter(ContactDB.categoria == "soporte").count()
-        otro = db.query(ContactDB).filter(ContactDB.categoria == "otro").count()
+        # Conteos cacheados unos segundos; se invalidan al crear contactos
+        counts = stats_cache.get_or_set("category_counts", lambda: crud.count_by_category(db))
+        total = sum(counts.values())
         
         stats = {
             "total_contacts": total,
             "categories": {
-                "ventas": ventas,
-                "soporte": soporte,
-                "otro": otro
+                "ventas": counts.get("ventas", 0),
+                "soporte": counts.get("soporte", 0),
+                "otro": counts.get("otro", 0)
             }
         }
         
@@ -174,22 +170,28 @@ async def get_stats(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=error_msg)
 
 @router.get("/health")
-async def health_check():
+def health_check(db: Session = Depends(get_db)):
     """
-    Health check endpoint para monitoreo de la aplicación
+    Health check endpoint para monitoreo de la aplicación.
+    Incluye un `SELECT 1`, así un pool agotado o una BD caída se ven aquí.
     
     Returns:
-        dict: Estado de la aplicación y timestamp
+        dict: Estado de la aplicación y timestamp (503 si la BD no responde)
     """
-    return {
-        "status": "healthy",
+    db_ok = check_database_connection(db)
+    status = {
+        "status": "healthy" if db_ok else "unhealthy",
         "timestamp": datetime.utcnow(),
         "service": "Contact Management API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "database": "connected" if db_ok else "disconnected"
     }
+    if not db_ok:
+        return ORJSONResponse(status_code=503, content=status)
+    return status
 
 @router.get("/classify-preview")
-async def classify_preview(message: str):
+def classify_preview(message: str):
     """
     Endpoint de prueba para ver cómo se clasificaría un mensaje
     Útil para testing y debugging
@@ -203,6 +205,9 @@ async def classify_preview(message: str):
     if len(message.strip()) < 5:
         raise HTTPException(status_code=400, detail="El mensaje debe tener al menos 5 caracteres")
     
-    details = classifier.get_classification_details(message)
+    # La clave es un digest fijo: la caché no retiene el texto de la consulta
+    details = classification_cache.get_or_set(
+        message_key(message), lambda: classifier.get_classification_details(message)
+    )
     logger.info(f"Preview de clasificación solicitado")
     return details
\ No newline at end of file
@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -9,18 +9,45 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./contacts.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# Pool de conexiones (PostgreSQL)
+# Recomendado: pool_size ≈ max_connections * fracción de la réplica / número de workers
+DB_POOL_CONFIG = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "40")),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800"))
+}
+
+# Caché de sentencias compiladas (por defecto 500); las consultas usan parámetros
+# enlazados, así que cada forma de consulta se compila una sola vez
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+
 # Configuración del engine
 if DATABASE_URL.startswith("postgresql://"):
     engine = create_engine(
         DATABASE_URL,
-        pool_size=10,
-        max_overflow=20,
-        pool_pre_ping=True
+        pool_pre_ping=True,
+        query_cache_size=DB_QUERY_CACHE_SIZE,
+        **DB_POOL_CONFIG
     )
 else:
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        query_cache_size=DB_QUERY_CACHE_SIZE
+    )
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL permite lecturas concurrentes con escrituras y reduce los fsync por commit"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
 
-engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -35,9 +62,41 @@ SMTP_CONFIG = {
 # External services
 SUPPORT_SERVICE_URL = os.getenv("SUPPORT_SERVICE_URL", "http://localhost:8001/support-service")
 
+# Micro-batching del clasificador
+CLASSIFIER_BATCH_CONFIG = {
+    "max_batch_size": int(os.getenv("CLASSIFIER_BATCH_SIZE", "32")),
+    "max_latency_ms": float(os.getenv("CLASSIFIER_BATCH_LATENCY_MS", "5"))
+}
+
+# Micro-batching de inserciones de contactos
+CONTACT_BATCH_CONFIG = {
+    "max_batch_size": int(os.getenv("CONTACT_BATCH_SIZE", "32")),
+    "max_latency_ms": float(os.getenv("CONTACT_BATCH_LATENCY_MS", "5"))
+}
+
+# Envío agrupado de emails de ventas por la sesión SMTP compartida.
+# Un lote de al menos `abort_min_batch` emails se aborta si falla más de un tercio.
+SALES_EMAIL_BATCH_CONFIG = {
+    "max_batch_size": int(os.getenv("SALES_EMAIL_BATCH_SIZE", "50")),
+    "max_latency_ms": float(os.getenv("SALES_EMAIL_BATCH_LATENCY_MS", "20")),
+    "abort_min_batch": int(os.getenv("SALES_EMAIL_ABORT_MIN_BATCH", "30"))
+}
+
+# Cachés en memoria (segundos / número de entradas)
+CACHE_CONFIG = {
+    "stats_ttl": float(os.getenv("STATS_CACHE_TTL", "10")),
+    "classify_preview_ttl": float(os.getenv("CLASSIFY_PREVIEW_CACHE_TTL", "300")),
+    "classify_preview_maxsize": int(os.getenv("CLASSIFY_PREVIEW_CACHE_SIZE", "10000"))
+}
+
+# CORS: orígenes permitidos separados por comas ("*" = cualquiera, sin credenciales)
+CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "*").split(",") if o.strip()]
+
 # API configuration
 API_CONFIG = {
     "host": os.getenv("API_HOST", "0.0.0.0"),
     "port": int(os.getenv("API_PORT", "8000")),
-    "debug": os.getenv("DEBUG", "True").lower() == "true"
+    "debug": os.getenv("DEBUG", "True").lower() == "true",
+    # Peticiones simultáneas por worker antes de responder 429 (0 = sin límite)
+    "max_concurrent_requests": int(os.getenv("MAX_CONCURRENT_REQUESTS", "200"))
 }
\ No newline at end of file
@@ -1,26 +1,37 @@
 import pytest
+import pytest_asyncio
 import asyncio
-from sqlalchemy import create_engine
+from functools import partial
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
 
+import main
 from main import app
-from config import Base
-from database.connection import get_db
+from config import Base, SessionLocal
+from database.connection import get_db, check_database_connection
+from services.singletons import stats_cache, classification_cache, contact_writer
 
-# Base de datos de prueba en memoria
-TEST_DATABASE_URL = "sqlite:///./test_contacts.db"
-test_engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+# Base de datos de prueba en memoria; StaticPool comparte una única conexión
+# para que todas las sesiones (y los hilos) vean la misma base
+TEST_DATABASE_URL = "sqlite://"
+test_engine = create_engine(
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
-def override_get_db():
-    """Override de la dependencia de BD para tests"""
-    try:
-        db = TestSessionLocal()
-        yield db
-    finally:
-        db.close()
+# pysqlite gestiona BEGIN por su cuenta y rompe los SAVEPOINT; se delega en SQLAlchemy
+@event.listens_for(test_engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(test_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -29,38 +40,77 @@ def event_loop():
     yield loop
     loop.close()
 
-@pytest.fixture(scope="function")
-def db_session():
-    """Crear BD de prueba para cada test"""
-    # Crear todas las tablas
+@pytest.fixture(scope="session")
+def test_database():
+    """Crear las tablas una sola vez por sesión de tests"""
     Base.metadata.create_all(bind=test_engine)
+    yield test_engine
+    Base.metadata.drop_all(bind=test_engine)
+
+@pytest.fixture(scope="function")
+def session_factory(test_database):
+    """
+    Fábrica de sesiones dentro de una transacción externa que se revierte al
+    terminar el test; cada commit de la aplicación libera solo un SAVEPOINT.
+    """
+    connection = test_database.connect()
+    transaction = connection.begin()
     
-    session = TestSessionLocal()
+    yield partial(TestSessionLocal, bind=connection, join_transaction_mode="create_savepoint")
+    
+    transaction.rollback()
+    connection.close()
+
+@pytest.fixture(scope="function")
+def db_session(session_factory):
+    """Sesión de BD de prueba aislada por test"""
+    session = session_factory()
     
     yield session
     
     session.close()
-    Base.metadata.drop_all(bind=test_engine)
 
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(db_session, session_factory, monkeypatch):
     """Cliente de prueba con BD mockeada"""
+    def override_get_db():
+        yield db_session
+    
+    # El lifespan no debe tocar la BD de producción: las tablas ya las crea `test_database`
+    monkeypatch.setattr(main, "init_database", lambda: None)
+    monkeypatch.setattr(main, "check_database_connection", lambda: check_database_connection(db_session))
+    
     app.dependency_overrides[get_db] = override_get_db
+    contact_writer.session_factory = session_factory
+    stats_cache.clear()
+    classification_cache.clear()
     
     with TestClient(app) as test_client:
         yield test_client
     
     app.dependency_overrides.clear()
+    contact_writer.session_factory = SessionLocal
 
-@pytest.fixture
-async def async_client(db_session):
+@pytest_asyncio.fixture
+async def async_client(db_session, session_factory, monkeypatch):
     """Cliente async para pruebas de GraphQL"""
+    def override_get_db():
+        yield db_session
+    
+    # Mismo aislamiento que `client`: nada debe llegar a la BD de producción
+    monkeypatch.setattr(main, "init_database", lambda: None)
+    monkeypatch.setattr(main, "check_database_connection", lambda: check_database_connection(db_session))
+    
     app.dependency_overrides[get_db] = override_get_db
+    contact_writer.session_factory = session_factory
+    stats_cache.clear()
+    classification_cache.clear()
     
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
     
     app.dependency_overrides.clear()
+    contact_writer.session_factory = SessionLocal
 
 @pytest.fixture
 def sample_contact_data():
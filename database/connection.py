@@ -1,10 +1,15 @@
 from sqlalchemy.orm import Session
+from typing import Optional
 from config import SessionLocal, engine, Base
 import logging
 from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
 logger = logging.getLogger(__name__)
 
+# Columnas consultadas con ILIKE '%texto%' en el filtro search_text de GraphQL
+TRIGRAM_INDEXED_COLUMNS = ("mensaje", "nombre", "email")
+
 def get_db():
     """
     Dependency injection para obtener sesión de base de datos
@@ -21,20 +26,55 @@ def init_database():
     """
     try:
         Base.metadata.create_all(bind=engine)
+        
+        # create_all no agrega índices a tablas ya existentes
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        
+        if engine.dialect.name == "postgresql":
+            create_trigram_indexes()
+        
         logger.info("Base de datos inicializada correctamente")
     except Exception as e:
         logger.error(f"Error inicializando base de datos: {str(e)}")
         raise
 
-def check_database_connection():
+def create_trigram_indexes():
     """
-    Verifica la conexión a la base de datos
+    Crea índices GIN de trigramas (pg_trgm) para las búsquedas ILIKE '%texto%'
+    del filtro search_text. Solo aplica a PostgreSQL.
+    
+    Es una optimización opcional: si no se pueden crear (rol sin permiso para
+    CREATE EXTENSION, pg_trgm no disponible) se registra un aviso y se continúa.
     """
     try:
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for column in TRIGRAM_INDEXED_COLUMNS:
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS ix_contacts_{column}_trgm "
+                    f"ON contacts USING gin ({column} gin_trgm_ops)"
+                ))
+    except SQLAlchemyError as e:
+        logger.warning(f"No se pudieron crear los índices de trigramas, se continúa sin ellos: {str(e)}")
+        return
+    logger.info("Índices de trigramas verificados")
+
+def check_database_connection(db: Optional[Session] = None):
+    """
+    Verifica la conexión a la base de datos con un `SELECT 1`
+    
+    Args:
+        db: Sesión a usar; si no se indica se abre una temporal
+    """
+    session = db if db is not None else SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
         return True
     except Exception as e:
         logger.error(f"Error de conexión a base de datos: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+    finally:
+        if db is None:
+            session.close()
\ No newline at end of file
@@ -0,0 +1,34 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert
+from typing import Any, Dict, List
+import logging
+
+from models.database import ContactDB
+
+logger = logging.getLogger(__name__)
+
+def create_contacts(db: Session, contacts: List[Dict[str, Any]]) -> List[ContactDB]:
+    """
+    Inserta varios contactos con un único INSERT multi-fila y un solo commit.
+    
+    Args:
+        contacts: Diccionarios con nombre, email, mensaje y categoria
+        
+    Returns:
+        List[ContactDB]: Filas insertadas, en el mismo orden que `contacts`
+    """
+    db_contacts = db.scalars(
+        insert(ContactDB).returning(ContactDB, sort_by_parameter_order=True),
+        contacts
+    ).all()
+    db.commit()
+    return db_contacts
+
+def count_by_category(db: Session) -> Dict[str, int]:
+    """
+    Cuenta los contactos de cada categoría con una sola consulta agregada
+    """
+    rows = db.query(ContactDB.categoria, func.count(ContactDB.id))\
+             .group_by(ContactDB.categoria)\
+             .all()
+    return dict(rows)
@@ -1,13 +1,16 @@
 import strawberry
-from typing import List, Optional
+from strawberry.types import Info
+from strawberry.types.nodes import SelectedField
+from typing import Callable, List, Optional, Set, TypeVar
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import datetime
+import asyncio
 import logging
 
 from models.database import ContactDB
-from services.classifier import MessageClassifier
-from services.automation import AutomationService
-from database.connection import get_db
+from services.singletons import classifier, batch_classifier, contact_writer, automation_service, stats_cache
+from database import crud
 from .types import (
     Contact, ContactStats, ClassificationResult, AutomationResult,
     ContactConnection, ContactInput, ContactFilter, PaginationInput,
@@ -16,13 +19,125 @@ from .types import (
 
 logger = logging.getLogger(__name__)
 
-classifier = MessageClassifier()
-automation_service = AutomationService()
+T = TypeVar("T")
 
-def get_db_session() -> Session:
-    """Helper para obtener sesión de BD en GraphQL"""
-    return next(get_db())
+# Caracteres de `mensaje` que necesita `mensajePreview` (100 + 1 para saber si se trunca)
+MENSAJE_PREVIEW_LENGTH = 101
 
+def _selected_node_fields(info: Info) -> Set[str]:
+    """
+    Nombres de los campos pedidos dentro de `nodes` (incluye fragmentos)
+    """
+    def collect(selections) -> Set[str]:
+        names = set()
+        for selection in selections:
+            if isinstance(selection, SelectedField):
+                names.add(selection.name)
+            else:
+                names |= collect(selection.selections)
+        return names
+    
+    def find_nodes(selections) -> Set[str]:
+        names = set()
+        for selection in selections:
+            if isinstance(selection, SelectedField):
+                if selection.name == "nodes":
+                    names |= collect(selection.selections)
+            else:
+                names |= find_nodes(selection.selections)
+        return names
+    
+    return find_nodes(info.selected_fields[0].selections)
+
+async def _run_db(info: Info, work: Callable[[Session], T]) -> T:
+    """
+    Ejecuta `work(db)` con la sesión de la petición en un hilo, fuera del event loop.
+    
+    La sesión no es segura entre hilos: el lock de la petición serializa los
+    resolvers que se resuelven en paralelo dentro de una misma consulta.
+    """
+    db = info.context["db"]
+    lock = info.context["db_lock"]
+    
+    def locked_work() -> T:
+        with lock:
+            return work(db)
+    
+    return await asyncio.to_thread(locked_work)
+
+def _fetch_contacts(db: Session, filter: Optional[ContactFilter], limit: int, offset: int, full_mensaje: bool):
+    """Consulta síncrona de una página de contactos y su total"""
+    query = db.query(ContactDB)
+    
+    if filter:
+        if filter.categoria:
+            query = query.filter(ContactDB.categoria == filter.categoria.value)
+        
+        if filter.fecha_desde:
+            query = query.filter(ContactDB.fecha_creacion >= filter.fecha_desde)
+        
+        if filter.fecha_hasta:
+            query = query.filter(ContactDB.fecha_creacion <= filter.fecha_hasta)
+        
+        if filter.search_text:
+            search_term = f"%{filter.search_text}%"
+            query = query.filter(
+                ContactDB.mensaje.ilike(search_term) |
+                ContactDB.nombre.ilike(search_term) |
+                ContactDB.email.ilike(search_term)
+            )
+    
+    if full_mensaje:
+        mensaje_column = ContactDB.mensaje
+    else:
+        mensaje_column = func.substr(ContactDB.mensaje, 1, MENSAJE_PREVIEW_LENGTH).label("mensaje")
+    
+    # El total sale de la misma consulta con COUNT(*) OVER ()
+    total_window = func.count().over().label("total_count")
+    rows = query.with_entities(
+                    ContactDB.id,
+                    ContactDB.nombre,
+                    ContactDB.email,
+                    mensaje_column,
+                    ContactDB.categoria,
+                    ContactDB.fecha_creacion,
+                    total_window
+                )\
+                .order_by(ContactDB.fecha_creacion.desc())\
+                .offset(offset)\
+                .limit(limit)\
+                .all()
+    
+    if rows:
+        total_count = rows[0].total_count
+    elif offset > 0:
+        # Página fuera de rango: no hay filas de donde leer el total
+        total_count = query.count()
+    else:
+        total_count = 0
+    
+    return rows, total_count
+
+def _delete_contact(db: Session, id: int) -> bool:
+    """Borrado síncrono de un contacto"""
+    try:
+        contact = db.get(ContactDB, id)
+        
+        if not contact:
+            logger.warning(f"GraphQL: Intento de eliminar contacto inexistente {id}")
+            return False
+        
+        db.delete(contact)
+        db.commit()
+        stats_cache.delete("category_counts")
+        
+        logger.info(f"GraphQL: Contacto {id} eliminado")
+        return True
+        
+    except Exception as e:
+        db.rollback()
+        logger.error(f"GraphQL: Error eliminando contacto {id}: {str(e)}")
+        return False
 
 @strawberry.type
 class Query:
@@ -31,8 +146,9 @@ class Query:
     """
     
     @strawberry.field
-    def contacts(
+    async def contacts(
         self, 
+        info: Info,
         filter: Optional[ContactFilter] = None,
         pagination: Optional[PaginationInput] = None
     ) -> ContactConnection:
@@ -59,70 +175,44 @@ class Query:
         }
         ```
         """
-        db = get_db_session()
+        if pagination:
+            limit = min(pagination.limit, 100) 
+            offset = pagination.offset
+        else:
+            limit, offset = 20, 0
         
-        try:
-            query = db.query(ContactDB)
-            
-            if filter:
-                if filter.categoria:
-                    query = query.filter(ContactDB.categoria == filter.categoria.value)
-                
-                if filter.fecha_desde:
-                    query = query.filter(ContactDB.fecha_creacion >= filter.fecha_desde)
-                
-                if filter.fecha_hasta:
-                    query = query.filter(ContactDB.fecha_creacion <= filter.fecha_hasta)
-                
-                if filter.search_text:
-                    search_term = f"%{filter.search_text}%"
-                    query = query.filter(
-                        ContactDB.mensaje.ilike(search_term) |
-                        ContactDB.nombre.ilike(search_term) |
-                        ContactDB.email.ilike(search_term)
-                    )
-            
-            total_count = query.count()
-            
-            if pagination:
-                limit = min(pagination.limit, 100) 
-                offset = pagination.offset
-            else:
-                limit, offset = 20, 0
-            
-            contacts = query.order_by(ContactDB.fecha_creacion.desc())\
-                           .offset(offset)\
-                           .limit(limit)\
-                           .all()
-            
-            graphql_contacts = [
-                Contact(
-                    id=c.id,
-                    nombre=c.nombre,
-                    email=c.email,
-                    mensaje=c.mensaje,
-                    categoria=CategoryEnum(c.categoria),
-                    fecha_creacion=c.fecha_creacion
-                ) for c in contacts
-            ]
-            
-            has_next = (offset + limit) < total_count
-            has_prev = offset > 0
-            
-            logger.info(f"GraphQL: {len(contacts)} contactos consultados")
-            
-            return ContactConnection(
-                nodes=graphql_contacts,
-                total_count=total_count,
-                has_next_page=has_next,
-                has_previous_page=has_prev
-            )
-            
-        finally:
-            db.close()
+        # Si no se pide `mensaje` completo, basta con el prefijo que usa `mensajePreview`
+        full_mensaje = "mensaje" in _selected_node_fields(info)
+        
+        rows, total_count = await _run_db(
+            info, lambda db: _fetch_contacts(db, filter, limit, offset, full_mensaje)
+        )
+        
+        graphql_contacts = [
+            Contact(
+                id=c.id,
+                nombre=c.nombre,
+                email=c.email,
+                mensaje=c.mensaje,
+                categoria=CategoryEnum(c.categoria),
+                fecha_creacion=c.fecha_creacion
+            ) for c in rows
+        ]
+        
+        has_next = (offset + limit) < total_count
+        has_prev = offset > 0
+        
+        logger.info(f"GraphQL: {len(rows)} contactos consultados")
+        
+        return ContactConnection(
+            nodes=graphql_contacts,
+            total_count=total_count,
+            has_next_page=has_next,
+            has_previous_page=has_prev
+        )
     
     @strawberry.field
-    def contact(self, id: int) -> Optional[Contact]:
+    async def contact(self, info: Info, id: int) -> Optional[Contact]:
         """
         Obtener un contacto específico por ID
         
@@ -140,28 +230,22 @@ class Query:
         }
         ```
         """
-        db = get_db_session()
+        contact_db = await _run_db(info, lambda db: db.get(ContactDB, id))
         
-        try:
-            contact_db = db.query(ContactDB).filter(ContactDB.id == id).first()
-            
-            if not contact_db:
-                return None
-            
-            return Contact(
-                id=contact_db.id,
-                nombre=contact_db.nombre,
-                email=contact_db.email,
-                mensaje=contact_db.mensaje,
-                categoria=CategoryEnum(contact_db.categoria),
-                fecha_creacion=contact_db.fecha_creacion
-            )
-            
-        finally:
-            db.close()
+        if not contact_db:
+            return None
+        
+        return Contact(
+            id=contact_db.id,
+            nombre=contact_db.nombre,
+            email=contact_db.email,
+            mensaje=contact_db.mensaje,
+            categoria=CategoryEnum(contact_db.categoria),
+            fecha_creacion=contact_db.fecha_creacion
+        )
     
     @strawberry.field
-    def stats(self) -> ContactStats:
+    async def stats(self, info: Info) -> ContactStats:
         """
         Obtener estadísticas del sistema
         
@@ -178,26 +262,19 @@ class Query:
         }
         ```
         """
-        db = get_db_session()
+        counts = await _run_db(
+            info, lambda db: stats_cache.get_or_set("category_counts", lambda: crud.count_by_category(db))
+        )
         
-        try:
-            total = db.query(ContactDB).count()
-            ventas = db.query(ContactDB).filter(ContactDB.categoria == "ventas").count()
-            soporte = db.query(ContactDB).filter(ContactDB.categoria == "soporte").count()
-            otro = db.query(ContactDB).filter(ContactDB.categoria == "otro").count()
-            
-            return ContactStats(
-                total_contacts=total,
-                ventas_count=ventas,
-                soporte_count=soporte,
-                otro_count=otro
-            )
-            
-        finally:
-            db.close()
+        return ContactStats(
+            total_contacts=sum(counts.values()),
+            ventas_count=counts.get("ventas", 0),
+            soporte_count=counts.get("soporte", 0),
+            otro_count=counts.get("otro", 0)
+        )
     
     @strawberry.field
-    def classify_message(self, mensaje: str) -> ClassificationResult:
+    async def classify_message(self, mensaje: str) -> ClassificationResult:
         """
         Clasificar un mensaje sin guardarlo (útil para testing)
         
@@ -212,7 +289,7 @@ class Query:
         }
         ```
         """
-        details = classifier.get_classification_details(mensaje)
+        details = await asyncio.to_thread(classifier.get_classification_details, mensaje)
         
         return ClassificationResult(
             mensaje=mensaje,
@@ -232,7 +309,7 @@ class Mutation:
     """
     
     @strawberry.mutation
-    async def create_contact(self, input: ContactInput) -> ContactCreateResponse:
+    async def create_contact(self, info: Info, input: ContactInput) -> ContactCreateResponse:
         """
         Crear un nuevo contacto con clasificación y automatización
         
@@ -261,8 +338,6 @@ class Mutation:
         }
         ```
         """
-        db = get_db_session()
-        
         try:
             if len(input.nombre.strip()) < 2:
                 return ContactCreateResponse(
@@ -270,6 +345,12 @@ class Mutation:
                     error="El nombre debe tener al menos 2 caracteres"
                 )
             
+            if len(input.nombre.strip()) > 100 or len(input.email) > 255:
+                return ContactCreateResponse(
+                    success=False,
+                    error="El nombre admite hasta 100 caracteres y el email hasta 255"
+                )
+            
             if len(input.mensaje.strip()) < 10:
                 return ContactCreateResponse(
                     success=False,
@@ -277,20 +358,18 @@ class Mutation:
                 )
             
             # 1. Clasificar mensaje
-            categoria = classifier.classify_message(input.mensaje)
+            categoria = await batch_classifier.submit(input.mensaje)
             logger.info(f"GraphQL: Mensaje clasificado como {categoria}")
             
-            # 2. Crear en BD
-            db_contact = ContactDB(
-                nombre=input.nombre.strip(),
-                email=input.email,
-                mensaje=input.mensaje.strip(),
-                categoria=categoria
-            )
+            # 2. Crear en BD (INSERT agrupado con los de REST)
+            db_contact = await contact_writer.submit({
+                "nombre": input.nombre.strip(),
+                "email": input.email,
+                "mensaje": input.mensaje.strip(),
+                "categoria": categoria
+            })
             
-            db.add(db_contact)
-            db.commit()
-            db.refresh(db_contact)
+            stats_cache.delete("category_counts")
             
             # 3. Ejecutar automatización
             automation_result = await automation_service.execute_automation(db_contact)
@@ -323,7 +402,6 @@ class Mutation:
             )
             
         except Exception as e:
-            db.rollback()
             error_msg = f"Error creando contacto: {str(e)}"
             logger.error(f"GraphQL: {error_msg}")
             
@@ -331,12 +409,9 @@ class Mutation:
                 success=False,
                 error=error_msg
             )
-            
-        finally:
-            db.close()
     
     @strawberry.mutation
-    def delete_contact(self, id: int) -> bool:
+    async def delete_contact(self, info: Info, id: int) -> bool:
         """
         Eliminar un contacto por ID
         
@@ -347,26 +422,4 @@ class Mutation:
         }
         ```
         """
-        db = get_db_session()
-        
-        try:
-            contact = db.query(ContactDB).filter(ContactDB.id == id).first()
-            
-            if not contact:
-                logger.warning(f"GraphQL: Intento de eliminar contacto inexistente {id}")
-                return False
-            
-            db.delete(contact)
-            db.commit()
-            
-            logger.info(f"GraphQL: Contacto {id} eliminado")
-            return True
-            
-        except Exception as e:
-            db.rollback()
-            logger.error(f"GraphQL: Error eliminando contacto {id}: {str(e)}")
-            return False
-            
-        finally:
-            db.close()
-
+        return await _run_db(info, lambda db: _delete_contact(db, id))
@@ -1,6 +1,11 @@
+import orjson
+import threading
 import strawberry
+from fastapi import Depends
+from sqlalchemy.orm import Session
 from strawberry.fastapi import GraphQLRouter
 from .resolvers import Query, Mutation
+from database.connection import get_db
 
 # Crear schema GraphQL
 schema = strawberry.Schema(
@@ -8,10 +13,25 @@ schema = strawberry.Schema(
     mutation=Mutation,
 )
 
+async def get_context(db: Session = Depends(get_db)):
+    """
+    Contexto por request: una sesión de BD que FastAPI cierra al terminar y el
+    lock que serializa su uso desde los hilos de los resolvers
+    """
+    return {"db": db, "db_lock": threading.Lock()}
+
+class ORJSONGraphQLRouter(GraphQLRouter):
+    """
+    GraphQLRouter que serializa las respuestas con orjson (bytes, sin pasar por str)
+    """
+    
+    def encode_json(self, response_data) -> bytes:
+        return orjson.dumps(response_data)
+
 """graphql_router = GraphQLRouter(
     schema,
     path="/graphql",
     graphql_ide="graphiql", 
 )"""
 
-graphql_router = GraphQLRouter(schema)
\ No newline at end of file
+graphql_router = ORJSONGraphQLRouter(schema, context_getter=get_context)
@@ -1,22 +1,36 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+import atexit
 import logging
+import queue
 
 from database.connection import init_database, check_database_connection
 from api.routes import router
+from api.middleware import ConcurrencyLimitMiddleware
 from graphql_app.schema import graphql_router
-from config import API_CONFIG
+from config import API_CONFIG, CORS_ORIGINS
+from services.singletons import batch_classifier, contact_writer, automation_service
 
-# Configuración de logging
+# Configuración de logging: los requests solo encolan el registro y un hilo
+# aparte (QueueListener) hace la escritura a archivo y consola
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(
+    log_queue,
+    logging.FileHandler('contact_backend.log',encoding="utf-8"),
+    logging.StreamHandler()
+)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('contact_backend.log',encoding="utf-8"),
-        logging.StreamHandler()
-    ]
+    handlers=[QueueHandler(log_queue)]
 )
+# Arranca al importar (no en el lifespan) para que ningún registro quede sin escribir;
+# al salir del proceso se vacía la cola
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
@@ -41,6 +55,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Cerrando aplicación...")
+    await batch_classifier.stop()
+    await contact_writer.stop()
+    await automation_service.aclose()
 
 # Crear aplicación FastAPI
 app = FastAPI(
@@ -69,15 +86,23 @@ app = FastAPI(
     """,
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
 
-# Configurar CORS
+# Backpressure: por encima del límite se responde 429 en lugar de saturar el pool de BD.
+# Se registra antes que CORS para que los 429 también lleven las cabeceras CORS.
+app.add_middleware(
+    ConcurrencyLimitMiddleware,
+    max_concurrent=API_CONFIG["max_concurrent_requests"]
+)
+
+# Configurar CORS (credenciales solo con una lista explícita de orígenes)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials="*" not in CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -115,12 +140,12 @@ async def root():
 @app.exception_handler(ValueError)
 async def value_error_handler(request, exc):
     logger.error(f"ValueError: {str(exc)}")
-    return {"detail": str(exc)}
+    return ORJSONResponse(status_code=400, content={"detail": str(exc)})
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     logger.error(f"Unexpected error: {str(exc)}")
-    return {"detail": "Error interno del servidor"}
+    return ORJSONResponse(status_code=500, content={"detail": "Error interno del servidor"})
 
 if __name__ == "__main__":
     import uvicorn
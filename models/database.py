@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from datetime import datetime
 from config import Base
 
@@ -15,5 +15,12 @@ class ContactDB(Base):
     categoria = Column(String(50), nullable=False)
     fecha_creacion = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Listados ordenados por fecha (más recientes primero)
+        Index("ix_contacts_fecha_creacion", "fecha_creacion"),
+        # Filtro por categoría + orden por fecha, y GROUP BY categoria en estadísticas
+        Index("ix_contacts_categoria_fecha", "categoria", "fecha_creacion"),
+    )
+    
     def __repr__(self):
         return f"<Contact(id={self.id}, nombre='{self.nombre}', categoria='{self.categoria}')>"
\ No newline at end of file
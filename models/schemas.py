@@ -1,35 +1,65 @@
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import networks
 from datetime import datetime
 from typing import Optional
+import re
+
+# Caso común (dirección ASCII simple): se valida con una regex precompilada.
+# Lo que no encaja se delega a email-validator, igual que EmailStr.
+_EMAIL_RE = re.compile(
+    r"(?P<local>[A-Za-z0-9_%+-]+(?:\.[A-Za-z0-9_%+-]+)*)"
+    r"@(?P<domain>(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+(?P<tld>[A-Za-z]{2,63}))"
+)
+# Dominios de uso especial que email-validator rechaza
+_SPECIAL_USE_TLDS = frozenset({"arpa", "invalid", "local", "localhost", "onion", "test"})
 
 class ContactCreate(BaseModel):
     """
     Schema para crear un nuevo contacto
     """
+    # Límites iguales al tamaño de las columnas en ContactDB (el del nombre se
+    # comprueba tras quitar espacios, que es lo que se guarda, igual que en GraphQL)
     nombre: str
-    email: EmailStr
+    email: str = Field(max_length=255, json_schema_extra={"format": "email"})
     mensaje: str
     
-    @validator('nombre')
-    def validate_nombre(cls, v):
-        if len(v.strip()) < 2:
-            raise ValueError('El nombre debe tener al menos 2 caracteres')
-        return v.strip()
-    
-    @validator('mensaje')
-    def validate_mensaje(cls, v):
-        if len(v.strip()) < 10:
-            raise ValueError('El mensaje debe tener al menos 10 caracteres')
-        return v.strip()
-    
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "nombre": "Juan Pérez",
                 "email": "juan@example.com",
                 "mensaje": "Hola, me interesa conocer más sobre sus servicios de desarrollo web"
             }
         }
+    )
+    
+    @field_validator('nombre')
+    @classmethod
+    def validate_nombre(cls, v: str) -> str:
+        v = v.strip()
+        if len(v) < 2:
+            raise ValueError('El nombre debe tener al menos 2 caracteres')
+        if len(v) > 100:
+            raise ValueError('El nombre admite hasta 100 caracteres')
+        return v
+    
+    @field_validator('email')
+    @classmethod
+    def validate_email(cls, v: str) -> str:
+        m = _EMAIL_RE.fullmatch(v)
+        # Etiquetas con "--" (punycode "xn--" y demás reservadas por IDNA) van al validador completo
+        if (m and len(m.group('local')) <= 64 and len(v) <= 254
+                and "--" not in m.group('domain')
+                and m.group('tld').lower() not in _SPECIAL_USE_TLDS):
+            return f"{m.group('local')}@{m.group('domain').lower()}"
+        return networks.validate_email(v)[1]
+    
+    @field_validator('mensaje')
+    @classmethod
+    def validate_mensaje(cls, v: str) -> str:
+        if len(v.strip()) < 10:
+            raise ValueError('El mensaje debe tener al menos 10 caracteres')
+        return v.strip()
 
 class ContactResponse(BaseModel):
     """
@@ -42,14 +72,16 @@ class ContactResponse(BaseModel):
     categoria: str
     fecha_creacion: datetime
     
-    class Config:
-        json_schema_extra ={
-        "example": {
-            "nombre": "Juan Pérez",
-            "email": "juan@example.com",
-            "mensaje": "Mensaje de ejemplo"
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "nombre": "Juan Pérez",
+                "email": "juan@example.com",
+                "mensaje": "Mensaje de ejemplo"
+            }
         }
-    }
+    )
 
 class ContactStats(BaseModel):
     """
@@ -1,14 +1,39 @@
+import re
+import asyncio
 import logging
 import smtplib
-import requests
+import threading
+import httpx
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any
-from config import SMTP_CONFIG, SUPPORT_SERVICE_URL
+from typing import Dict, Any, List, Optional
+from config import SMTP_CONFIG, SUPPORT_SERVICE_URL, SALES_EMAIL_BATCH_CONFIG
 from models.database import ContactDB
+from services.batching import AsyncBatcher
 
 logger = logging.getLogger(__name__)
 
+# Palabras que elevan la prioridad de un ticket de soporte
+HIGH_PRIORITY_KEYWORDS = (
+    'urgente', 'emergencia', 'crítico', 'no funciona', 'caído',
+    'urgent', 'emergency', 'critical', 'down', 'broken'
+)
+
+class SalesEmailBatcher(AsyncBatcher):
+    """
+    Agrupa los emails de ventas concurrentes y los envía uno tras otro por la
+    misma sesión SMTP, en un hilo aparte.
+    """
+    
+    def __init__(self, service: "AutomationService", max_batch_size: int = 50,
+                 max_latency_ms: float = 20.0, abort_min_batch: int = 30):
+        super().__init__(max_batch_size=max_batch_size, max_latency_ms=max_latency_ms)
+        self.service = service
+        self.abort_min_batch = abort_min_batch
+    
+    async def process_batch(self, messages: List[MIMEMultipart]) -> List[Optional[Exception]]:
+        return await asyncio.to_thread(self.service._send_smtp_batch, messages, self.abort_min_batch)
+
 class AutomationService:
     """
     Servicio para ejecutar automatizaciones según la categoría del mensaje.
@@ -19,9 +44,122 @@ class AutomationService:
     - Otro: Sin acción adicional
     """
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.smtp_config = SMTP_CONFIG
         self.support_service_url = SUPPORT_SERVICE_URL
+        self._http_client = http_client
+        
+        # Sesión SMTP persistente: el handshake (TLS + login) se paga una sola vez
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_lock = threading.Lock()
+        self.sales_email_batcher = SalesEmailBatcher(self, **SALES_EMAIL_BATCH_CONFIG)
+        
+        self.high_priority_keywords = HIGH_PRIORITY_KEYWORDS
+        # Una sola búsqueda en C en lugar de un `in` por palabra clave
+        self._high_priority_pattern = re.compile(
+            "|".join(re.escape(keyword) for keyword in self.high_priority_keywords)
+        )
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """
+        Cliente HTTP compartido (keep-alive) para las notificaciones salientes.
+        Se crea en el primer uso y se reabre si fue cerrado.
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=10,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+            )
+        return self._http_client
+    
+    async def aclose(self):
+        """
+        Cierra el cliente HTTP compartido y la sesión SMTP
+        """
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        self._http_client = None
+        
+        await self.sales_email_batcher.stop()
+        if self._smtp is not None:
+            await asyncio.to_thread(self._close_smtp)
+    
+    def _smtp_session(self) -> smtplib.SMTP:
+        """
+        Devuelve la sesión SMTP abierta o abre una nueva (STARTTLS + login)
+        """
+        if self._smtp is None:
+            server = smtplib.SMTP(self.smtp_config["server"], self.smtp_config["port"], timeout=30)
+            try:
+                server.starttls()
+                server.login(self.smtp_config["user"], self.smtp_config["password"])
+            except Exception:
+                server.close()
+                raise
+            self._smtp = server
+        return self._smtp
+    
+    def _close_smtp(self):
+        """Cierra la sesión SMTP; si el servidor ya cortó, solo libera el socket"""
+        with self._smtp_lock:
+            server, self._smtp = self._smtp, None
+            if server is None:
+                return
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                server.close()
+    
+    def _send_smtp_batch(self, messages: List[MIMEMultipart], abort_min_batch: int = 30) -> List[Optional[Exception]]:
+        """
+        Envía un lote por la sesión persistente y devuelve el error de cada mensaje (o None).
+        
+        En lotes de al menos `abort_min_batch` mensajes, si falla más de un tercio se
+        aborta el resto para no insistir contra el límite de envío del proveedor. Si no
+        se puede abrir la sesión SMTP, el resto del lote falla sin volver a conectar.
+        """
+        results: List[Optional[Exception]] = []
+        failures = 0
+        abort_threshold = len(messages) / 3 if len(messages) >= abort_min_batch else None
+        
+        with self._smtp_lock:
+            unavailable: Optional[Exception] = None
+            for msg in messages:
+                if unavailable is not None:
+                    results.append(unavailable)
+                    continue
+                if abort_threshold is not None and failures > abort_threshold:
+                    results.append(Exception("Lote de emails abortado: demasiados fallos"))
+                    continue
+                try:
+                    self._send_locked(msg)
+                    results.append(None)
+                except Exception as e:
+                    failures += 1
+                    results.append(e)
+                    if self._smtp is None:
+                        # No se pudo abrir la sesión: el resto del lote no vuelve a intentar conectar
+                        unavailable = Exception(f"Lote de emails abortado: servidor SMTP no disponible ({e})")
+        
+        if failures:
+            aborted = len(results) - results.count(None) - failures
+            logger.warning(f"Lote SMTP: {failures} de {len(messages)} emails fallaron, {aborted} abortados")
+        return results
+    
+    def _send_locked(self, msg: MIMEMultipart):
+        """
+        Envía con el lock ya tomado. Si el servidor cerró la conexión
+        (timeout por inactividad), reconecta y reintenta una vez. Un error al
+        conectar (p. ej. servidor caído) no se reintenta.
+        """
+        try:
+            self._smtp_session().send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            if self._smtp is not None:
+                self._smtp.close()
+                self._smtp = None
+            self._smtp_session().send_message(msg)
     
     async def execute_automation(self, contact: ContactDB) -> Dict[str, Any]:
         """
@@ -157,11 +295,8 @@ class AutomationService:
             
             msg.attach(MIMEText(body, 'plain'))
             
-            with smtplib.SMTP(self.smtp_config["server"], self.smtp_config["port"]) as server:
-                server.starttls()
-                server.login(self.smtp_config["user"], self.smtp_config["password"])
-                server.send_message(msg)
-                
+            await self.sales_email_batcher.submit(msg)
+            
             logger.info(f"Email real enviado para contacto {contact.id}")
                 
         except Exception as e:
@@ -172,10 +307,9 @@ class AutomationService:
         Notificación real al microservicio (para producción)
         """
         try:
-            response = requests.post(
+            response = await self.http_client.post(
                 self.support_service_url,
                 json=payload,
-                timeout=10,
                 headers={"Content-Type": "application/json"}
             )
             response.raise_for_status()
@@ -183,21 +317,14 @@ class AutomationService:
             logger.info(f"Soporte notificado exitosamente: {response.status_code}")
             return response.json()
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"Error notificando a soporte: {str(e)}")
     
     def _determine_priority(self, message: str) -> str:
         """
         Determina la prioridad del ticket de soporte basado en el mensaje
         """
-        message_lower = message.lower()
-        
-        high_priority_keywords = [
-            'urgente', 'emergencia', 'crítico', 'no funciona', 'caído',
-            'urgent', 'emergency', 'critical', 'down', 'broken'
-        ]
-        
-        if any(keyword in message_lower for keyword in high_priority_keywords):
+        if self._high_priority_pattern.search(message.lower()):
             return "high"
         else:
             return "normal"
\ No newline at end of file
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class AsyncBatcher(ABC):
+    """
+    Agrupa peticiones concurrentes en lotes para procesarlas en una sola llamada.
+
+    Los elementos se acumulan hasta alcanzar `max_batch_size` o hasta que
+    transcurren `max_latency_ms` desde que llegó el primero del lote.
+    Las subclases implementan `process_batch`.
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_latency_ms: float = 5.0):
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Encola un elemento y espera el resultado de su lote
+
+        Args:
+            item: Elemento a procesar
+
+        Returns:
+            Resultado correspondiente al elemento
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    @abstractmethod
+    async def process_batch(self, items: List[Any]) -> List[Any]:
+        """
+        Procesa un lote completo; debe devolver un resultado por elemento y en el mismo orden.
+        Si el resultado de un elemento es una excepción, solo ese elemento falla.
+        """
+
+    async def stop(self):
+        """
+        Detiene el worker y cancela los elementos pendientes
+        """
+        worker, queue = self._worker, self._queue
+        self._worker, self._queue = None, None
+
+        if worker is None or worker.done():
+            return
+
+        # El worker solo puede esperarse desde su propio event loop
+        if worker.get_loop() is not asyncio.get_running_loop():
+            return
+
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
+
+        while not queue.empty():
+            _, future = queue.get_nowait()
+            if not future.done():
+                future.cancel()
+
+    def _ensure_worker(self):
+        """Arranca el worker en el event loop actual si no está corriendo"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+
+    async def _run(self, queue: asyncio.Queue):
+        """Bucle del worker: arma lotes y los despacha"""
+        loop = asyncio.get_running_loop()
+        max_wait = self.max_latency_ms / 1000
+
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + max_wait
+
+            try:
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout=timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Cancelado mientras se armaba el lote: esos elementos ya no están en la cola
+                self._cancel_pending(batch)
+                raise
+
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[tuple]):
+        """Procesa un lote y resuelve el future de cada elemento"""
+        items = [item for item, _ in batch]
+
+        try:
+            try:
+                results = await self.process_batch(items)
+            except Exception as e:
+                logger.error(f"Error procesando lote de {len(items)} elementos: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            # Si el worker se cancela a mitad de lote, ningún request queda esperando
+            self._cancel_pending(batch)
+
+    @staticmethod
+    def _cancel_pending(batch: List[tuple]):
+        """Cancela los futures del lote que sigan sin resolver"""
+        for _, future in batch:
+            if not future.done():
+                future.cancel()
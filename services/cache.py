@@ -0,0 +1,79 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+def message_key(text: str) -> bytes:
+    """
+    Clave de tamaño fijo para cachear por contenido de un texto.
+    
+    Guardar el texto completo como clave mantendría vivo en memoria cada
+    cuerpo recibido mientras siga en la caché; el digest ocupa 16 bytes
+    sea cual sea su longitud.
+    """
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+class TTLCache:
+    """
+    Caché en memoria con expiración por tiempo y tamaño máximo.
+    
+    Pensada para resultados idempotentes que toleran unos segundos de
+    antigüedad (estadísticas, previsualizaciones). Es segura entre hilos,
+    ya que los endpoints síncronos corren en el thread pool de FastAPI.
+    """
+    
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Devuelve el valor vigente para la clave o `default` si no existe o expiró
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any):
+        """
+        Guarda un valor; descarta el más antiguo si se supera `maxsize`
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor en caché o lo calcula con `factory` y lo guarda
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+    
+    def delete(self, key: Hashable):
+        """Invalida una clave"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        """Invalida todas las claves"""
+        with self._lock:
+            self._data.clear()
@@ -1,8 +1,46 @@
+import re
+import asyncio
 import logging
-from typing import Dict, List
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Pattern, Set, Tuple
+
+from services.batching import AsyncBatcher
+from services.cache import message_key
 
 logger = logging.getLogger(__name__)
 
+# Listas de palabras clave: constantes de módulo, se crean una sola vez al importar
+SALES_KEYWORDS = (
+    # Español
+    'comprar', 'precio', 'costo', 'cotización', 'presupuesto', 'venta',
+    'producto', 'servicio', 'oferta', 'descuento', 'comercial', 'adquirir',
+    'cuánto cuesta', 'me interesa', 'quisiera', 'necesito', 'contratar',
+    # Inglés
+    'buy', 'price', 'quote', 'purchase', 'sale', 'offer', 'discount',
+    'cost', 'interested', 'need', 'want', 'hire'
+)
+
+SUPPORT_KEYWORDS = (
+    # Español
+    'problema', 'error', 'bug', 'ayuda', 'soporte', 'técnico', 'falla',
+    'no funciona', 'roto', 'arreglar', 'reparar', 'urgente', 'emergencia',
+    # Inglés
+    'support', 'help', 'issue', 'technical', 'assistance', 'trouble',
+    'fix', 'repair', 'maintenance', 'broken', 'not working', 'urgent'
+)
+
+SALES_PATTERNS = (
+    'cuánto', 'precio', '$', 'comprar', 'contratar', 'me interesa',
+    'quisiera saber', 'necesito información'
+)
+
+SUPPORT_PATTERNS = (
+    'no funciona', 'problema con', 'error en', 'ayuda con',
+    'no puedo', 'está roto', 'falla'
+)
+
 class MessageClassifier:
     """
     Servicio de clasificación de mensajes usando NLP.
@@ -11,35 +49,34 @@ class MessageClassifier:
     Extensible para: OpenAI, HuggingFace, modelos custom, etc.
     """
     
-    def __init__(self):
-        self.sales_keywords = [
-            # Español
-            'comprar', 'precio', 'costo', 'cotización', 'presupuesto', 'venta',
-            'producto', 'servicio', 'oferta', 'descuento', 'comercial', 'adquirir',
-            'cuánto cuesta', 'me interesa', 'quisiera', 'necesito', 'contratar',
-            # Inglés
-            'buy', 'price', 'quote', 'purchase', 'sale', 'offer', 'discount',
-            'cost', 'interested', 'need', 'want', 'hire'
-        ]
+    def __init__(self, cache_size: int = 4096):
+        self.sales_keywords = SALES_KEYWORDS
+        self.support_keywords = SUPPORT_KEYWORDS
+        self.sales_patterns = SALES_PATTERNS
+        self.support_patterns = SUPPORT_PATTERNS
         
-        self.support_keywords = [
-            # Español
-            'problema', 'error', 'bug', 'ayuda', 'soporte', 'técnico', 'falla',
-            'no funciona', 'roto', 'arreglar', 'reparar', 'urgente', 'emergencia',
-            # Inglés
-            'support', 'help', 'issue', 'technical', 'assistance', 'trouble',
-            'fix', 'repair', 'maintenance', 'broken', 'not working', 'urgent'
-        ]
+        # Aporte de cada lista a las puntuaciones (ventas, soporte); los patrones pesan el doble
+        self._group_weights = {
+            "sales_keywords": (1, 0),
+            "support_keywords": (0, 1),
+            "sales_patterns": (2, 0),
+            "support_patterns": (0, 2)
+        }
         
-        self.sales_patterns = [
-            'cuánto', 'precio', '$', 'comprar', 'contratar', 'me interesa',
-            'quisiera saber', 'necesito información'
-        ]
+        # Autómata único para las cuatro listas: una sola pasada en C por mensaje.
+        # Se comparte entre todas las instancias que usan las mismas listas.
+        self._pattern, self._contained = self._compile_matcher((
+            ("sales_keywords", tuple(self.sales_keywords)),
+            ("support_keywords", tuple(self.support_keywords)),
+            ("sales_patterns", tuple(self.sales_patterns)),
+            ("support_patterns", tuple(self.support_patterns))
+        ))
         
-        self.support_patterns = [
-            'no funciona', 'problema con', 'error en', 'ayuda con',
-            'no puedo', 'está roto', 'falla'
-        ]
+        # Caché LRU acotada por instancia, indexada por digest del mensaje: los mensajes
+        # repetidos no se vuelven a escanear y la caché no retiene el texto recibido
+        self._cache_size = cache_size
+        self._score_cache: "OrderedDict[bytes, Tuple[int, int]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def classify_message(self, message: str) -> str:
         """
@@ -54,49 +91,135 @@ class MessageClassifier:
         Returns:
             str: Categoría detectada ('ventas', 'soporte', 'otro')
         """
-        message_lower = message.lower()
-        
-        # 1. Contar coincidencias con palabras clave
-        sales_score = self._calculate_keyword_score(message_lower, self.sales_keywords)
-        support_score = self._calculate_keyword_score(message_lower, self.support_keywords)
+        return self._classify_lower(message.lower())
+    
+    def classify_messages(self, messages: List[str]) -> List[str]:
+        """
+        Clasifica un lote de mensajes en una sola llamada
         
-        # 2. Analizar patrones específicos (peso mayor)
-        sales_pattern_score = self._calculate_pattern_score(message_lower, self.sales_patterns) * 2
-        support_pattern_score = self._calculate_pattern_score(message_lower, self.support_patterns) * 2
+        Args:
+            messages (List[str]): Mensajes a clasificar
+            
+        Returns:
+            List[str]: Categoría de cada mensaje, en el mismo orden
+        """
+        return [self._classify_lower(message.lower()) for message in messages]
+    
+    def _classify_lower(self, message_lower: str) -> str:
+        """Clasifica un mensaje ya convertido a minúsculas"""
+        final_sales_score, final_support_score = self._score(message_lower)
+        category = self._categorize(final_sales_score, final_support_score)
         
-        final_sales_score = sales_score + sales_pattern_score
-        final_support_score = support_score + support_pattern_score
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Clasificación: '{category}' (ventas: {final_sales_score}, soporte: {final_support_score})")
+        return category
+    
+    @staticmethod
+    def _categorize(sales_score: int, support_score: int) -> str:
+        """Decide la categoría a partir de las puntuaciones finales"""
+        if sales_score > support_score and sales_score > 0:
+            return "ventas"
+        if support_score > sales_score and support_score > 0:
+            return "soporte"
+        return "otro"
+    
+    def _score(self, message_lower: str) -> Tuple[int, int]:
+        """Puntuaciones (ventas, soporte) de un mensaje en minúsculas, desde la caché si es posible"""
+        if self._cache_size <= 0:
+            return self._compute_scores(message_lower)
         
-        if final_sales_score > final_support_score and final_sales_score > 0:
-            category = "ventas"
-        elif final_support_score > final_sales_score and final_support_score > 0:
-            category = "soporte"
-        else:
-            category = "otro"
+        key = message_key(message_lower)
+        with self._cache_lock:
+            scores = self._score_cache.get(key)
+            if scores is not None:
+                self._score_cache.move_to_end(key)
+                return scores
         
-        logger.info(f"Clasificación: '{category}' (ventas: {final_sales_score}, soporte: {final_support_score})")
-        return category
+        scores = self._compute_scores(message_lower)
+        with self._cache_lock:
+            self._score_cache[key] = scores
+            while len(self._score_cache) > self._cache_size:
+                self._score_cache.popitem(last=False)
+        return scores
     
-    def _calculate_keyword_score(self, message: str, keywords: List[str]) -> int:
-        """Calcula puntuación basada en palabras clave exactas"""
-        return sum(1 for keyword in keywords if keyword in message)
+    def _compute_scores(self, message_lower: str) -> Tuple[int, int]:
+        """
+        Calcula las puntuaciones (ventas, soporte) de un mensaje en minúsculas
+        """
+        return self._scores_from_matches(self._find_matches(message_lower))
     
-    def _calculate_pattern_score(self, message: str, patterns: List[str]) -> int:
-        """Calcula puntuación basada en patrones más específicos"""
-        return sum(1 for pattern in patterns if pattern in message)
+    def _scores_from_matches(self, matches: Set[Tuple[str, str]]) -> Tuple[int, int]:
+        """Puntuaciones (ventas, soporte) a partir de las coincidencias ya encontradas"""
+        sales_score = support_score = 0
+        for group, _ in matches:
+            sales_weight, support_weight = self._group_weights[group]
+            sales_score += sales_weight
+            support_score += support_weight
+        return sales_score, support_score
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _compile_matcher(groups: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> Tuple[Pattern, Dict[str, FrozenSet[Tuple[str, str]]]]:
+        """
+        Compila todas las listas de palabras clave en una sola expresión regular.
+        
+        El lookahead encuentra en cada posición el término más largo que empieza ahí;
+        los términos contenidos en él (p. ej. 'cost' en 'costo') y las listas a las que
+        pertenece cada uno se recuperan con la tabla `contained`. Así el resultado es
+        idéntico a evaluar `kw in message` para cada palabra de cada lista.
+        
+        El resultado se cachea por contenido de las listas; la tabla devuelta es de solo lectura.
+        
+        Args:
+            groups: Pares (nombre de la lista, palabras clave)
+        
+        Returns:
+            Tuple: (expresión compilada, término -> {(lista, palabra clave), ...})
+        """
+        entries = [(group, kw) for group, keywords in groups for kw in keywords]
+        terms = sorted({kw for _, kw in entries}, key=len, reverse=True)
+        
+        pattern = re.compile("(?=(" + "|".join(re.escape(term) for term in terms) + "))")
+        contained = {
+            term: frozenset((group, kw) for group, kw in entries if kw in term)
+            for term in terms
+        }
+        return pattern, contained
+    
+    def _find_matches(self, message: str) -> Set[Tuple[str, str]]:
+        """Devuelve los pares (lista, palabra clave) presentes en el mensaje"""
+        matches = set()
+        for found in set(self._pattern.findall(message)):
+            matches |= self._contained[found]
+        return matches
     
     def get_classification_details(self, message: str) -> Dict:
         """
         Devuelve detalles de la clasificación para debugging
         """
-        message_lower = message.lower()
+        matches = self._find_matches(message.lower())
         
-        sales_matches = [kw for kw in self.sales_keywords if kw in message_lower]
-        support_matches = [kw for kw in self.support_keywords if kw in message_lower]
+        # Se conserva el orden de las listas originales
+        sales_matches = [kw for kw in self.sales_keywords if ("sales_keywords", kw) in matches]
+        support_matches = [kw for kw in self.support_keywords if ("support_keywords", kw) in matches]
         
         return {
             "message_preview": message[:100] + "..." if len(message) > 100 else message,
             "sales_matches": sales_matches,
             "support_matches": support_matches,
-            "final_category": self.classify_message(message)
-        }
\ No newline at end of file
+            "final_category": self._categorize(*self._scores_from_matches(matches))
+        }
+
+class BatchClassifier(AsyncBatcher):
+    """
+    Clasificador con micro-batching: agrupa los mensajes que llegan de forma
+    concurrente y los clasifica con una sola llamada a `classify_messages`.
+    """
+    
+    def __init__(self, classifier: MessageClassifier, max_batch_size: int = 32, max_latency_ms: float = 5.0):
+        super().__init__(max_batch_size=max_batch_size, max_latency_ms=max_latency_ms)
+        self.classifier = classifier
+    
+    async def process_batch(self, messages: List[str]) -> List[str]:
+        # El escaneo es CPU puro: se ejecuta en un hilo para no bloquear el event loop
+        return await asyncio.to_thread(self.classifier.classify_messages, messages)
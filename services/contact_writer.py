@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Union
+
+from sqlalchemy.orm import Session
+
+from database import crud
+from models.database import ContactDB
+from services.batching import AsyncBatcher
+
+logger = logging.getLogger(__name__)
+
+class ContactWriter(AsyncBatcher):
+    """
+    Agrupa las inserciones concurrentes de contactos en un único INSERT
+    multi-fila con RETURNING: un commit (y un fsync) por lote en lugar de
+    uno por request.
+    """
+    
+    def __init__(self, session_factory: Callable[..., Session], max_batch_size: int = 32, max_latency_ms: float = 5.0):
+        super().__init__(max_batch_size=max_batch_size, max_latency_ms=max_latency_ms)
+        self.session_factory = session_factory
+    
+    async def process_batch(self, contacts: List[Dict[str, Any]]) -> List[ContactDB]:
+        return await asyncio.to_thread(self._write_batch, contacts)
+    
+    def _write_batch(self, contacts: List[Dict[str, Any]]) -> List[Union[ContactDB, Exception]]:
+        """
+        Inserta el lote en su propia sesión (se ejecuta en un hilo).
+        
+        Si el INSERT multi-fila falla, se reintenta fila a fila para que una
+        fila inválida solo haga fallar a su propio request.
+        """
+        # Sin expirar en el commit: las filas devueltas se usan ya desconectadas
+        db = self.session_factory(expire_on_commit=False)
+        try:
+            db_contacts = crud.create_contacts(db, contacts)
+            logger.info(f"Lote de {len(db_contacts)} contactos insertado")
+            return db_contacts
+        except Exception as e:
+            db.rollback()
+            if len(contacts) == 1:
+                raise
+            logger.warning(f"Falló el lote de {len(contacts)} contactos, reintentando fila a fila: {str(e)}")
+        finally:
+            db.close()
+        
+        return [self._write_one(contact) for contact in contacts]
+    
+    def _write_one(self, contact: Dict[str, Any]) -> Union[ContactDB, Exception]:
+        """
+        Inserta una sola fila en una sesión propia (un rollback no expira las
+        filas ya insertadas); devuelve la excepción en lugar de lanzarla
+        """
+        db = self.session_factory(expire_on_commit=False)
+        try:
+            return crud.create_contacts(db, [contact])[0]
+        except Exception as e:
+            db.rollback()
+            return e
+        finally:
+            db.close()
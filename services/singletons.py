@@ -0,0 +1,18 @@
+from services.classifier import MessageClassifier, BatchClassifier
+from services.automation import AutomationService
+from services.cache import TTLCache
+from services.contact_writer import ContactWriter
+from config import SessionLocal, CLASSIFIER_BATCH_CONFIG, CONTACT_BATCH_CONFIG, CACHE_CONFIG
+
+# Instancias únicas por proceso, compartidas por la API REST y GraphQL
+classifier = MessageClassifier()
+batch_classifier = BatchClassifier(classifier, **CLASSIFIER_BATCH_CONFIG)
+automation_service = AutomationService()
+contact_writer = ContactWriter(SessionLocal, **CONTACT_BATCH_CONFIG)
+
+# Cachés compartidas: conteos por categoría y previsualizaciones de clasificación
+stats_cache = TTLCache(ttl=CACHE_CONFIG["stats_ttl"], maxsize=1)
+classification_cache = TTLCache(
+    ttl=CACHE_CONFIG["classify_preview_ttl"],
+    maxsize=CACHE_CONFIG["classify_preview_maxsize"]
+)
@@ -0,0 +1,180 @@
+import pytest
+import asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from api.middleware import ConcurrencyLimitMiddleware
+from services.singletons import classification_cache
+from models.database import ContactDB
+
+class TestStatsEndpoint:
+    """Tests para el endpoint de estadísticas"""
+    
+    def test_stats_empty(self, client):
+        """Test estadísticas sin contactos"""
+        response = client.get("/api/v1/stats")
+        
+        assert response.status_code == 200
+        assert response.json() == {
+            "total_contacts": 0,
+            "categories": {"ventas": 0, "soporte": 0, "otro": 0}
+        }
+    
+    def test_stats_by_category(self, client, sample_sales_contact, sample_support_contact):
+        """Test conteo por categoría tras crear contactos"""
+        client.post("/api/v1/contact", json=sample_sales_contact)
+        client.post("/api/v1/contact", json=sample_support_contact)
+        
+        data = client.get("/api/v1/stats").json()
+        
+        assert data["total_contacts"] == 2
+        assert data["categories"] == {"ventas": 1, "soporte": 1, "otro": 0}
+    
+    def test_stats_cache_invalidated_on_create(self, client, sample_sales_contact):
+        """Test que crear un contacto invalida las estadísticas cacheadas"""
+        assert client.get("/api/v1/stats").json()["total_contacts"] == 0
+        
+        client.post("/api/v1/contact", json=sample_sales_contact)
+        
+        assert client.get("/api/v1/stats").json()["total_contacts"] == 1
+
+class TestHealthEndpoint:
+    """Tests para el health check"""
+    
+    def test_health_checks_database(self, client):
+        """Test que el health check consulta la base de datos"""
+        response = client.get("/api/v1/health")
+        
+        assert response.status_code == 200
+        assert response.json()["status"] == "healthy"
+        assert response.json()["database"] == "connected"
+
+class TestClassifyPreview:
+    """Tests para la previsualización de clasificación"""
+    
+    def test_cache_keyed_by_digest(self, client):
+        """Test que la caché no guarda el mensaje consultado como clave"""
+        message = "Tengo un problema urgente " * 1000
+        
+        first = client.get("/api/v1/classify-preview", params={"message": message}).json()
+        second = client.get("/api/v1/classify-preview", params={"message": message}).json()
+        
+        assert first == second
+        assert first["final_category"] == "soporte"
+        assert len(classification_cache._data) == 1
+        assert all(len(key) == 16 for key in classification_cache._data)
+
+class TestGraphQL:
+    """Tests para la API GraphQL"""
+    
+    def test_contacts_pagination(self, client, sample_contact_data):
+        """Test paginación y total de contactos"""
+        for _ in range(3):
+            client.post("/api/v1/contact", json=sample_contact_data)
+        
+        query = "{ contacts(pagination: {limit: 2, offset: 0}) { totalCount hasNextPage nodes { id } } }"
+        data = client.post("/graphql", json={"query": query}).json()["data"]["contacts"]
+        
+        assert data["totalCount"] == 3
+        assert data["hasNextPage"] is True
+        assert len(data["nodes"]) == 2
+    
+    def test_contacts_offset_out_of_range(self, client, sample_contact_data):
+        """Test que el total se mantiene con un offset fuera de rango"""
+        client.post("/api/v1/contact", json=sample_contact_data)
+        
+        query = "{ contacts(pagination: {limit: 2, offset: 10}) { totalCount nodes { id } } }"
+        data = client.post("/graphql", json={"query": query}).json()["data"]["contacts"]
+        
+        assert data["totalCount"] == 1
+        assert data["nodes"] == []
+    
+    def test_contacts_preview_and_full_message(self, client, sample_contact_data):
+        """Test que mensajePreview se trunca y mensaje se devuelve completo"""
+        sample_contact_data["mensaje"] = "Me interesa " + "x" * 200
+        client.post("/api/v1/contact", json=sample_contact_data)
+        
+        query = "{ contacts { nodes { mensajePreview } } }"
+        node = client.post("/graphql", json={"query": query}).json()["data"]["contacts"]["nodes"][0]
+        assert node["mensajePreview"] == sample_contact_data["mensaje"][:100] + "..."
+        
+        query = "{ contacts { nodes { mensaje mensajePreview } } }"
+        node = client.post("/graphql", json={"query": query}).json()["data"]["contacts"]["nodes"][0]
+        assert node["mensaje"] == sample_contact_data["mensaje"]
+    
+    def test_parallel_resolvers_share_session(self, client, sample_contact_data):
+        """Test que varios resolvers de una misma consulta usan la sesión sin pisarse"""
+        contact_id = client.post("/api/v1/contact", json=sample_contact_data).json()["id"]
+        
+        query = f"{{ contacts {{ totalCount }} stats {{ totalContacts }} contact(id: {contact_id}) {{ nombre }} }}"
+        data = client.post("/graphql", json={"query": query}).json()["data"]
+        
+        assert data["contacts"]["totalCount"] == 1
+        assert data["stats"]["totalContacts"] == 1
+        assert data["contact"]["nombre"] == sample_contact_data["nombre"]
+    
+    def test_delete_contact_mutation(self, client, sample_contact_data):
+        """Test que la mutación elimina el contacto"""
+        contact_id = client.post("/api/v1/contact", json=sample_contact_data).json()["id"]
+        
+        mutation = f"mutation {{ deleteContact(id: {contact_id}) }}"
+        assert client.post("/graphql", json={"query": mutation}).json()["data"]["deleteContact"] is True
+        assert client.post("/graphql", json={"query": mutation}).json()["data"]["deleteContact"] is False
+    
+    def test_create_contact_mutation(self, client):
+        """Test que la mutación crea el contacto y aparece en las estadísticas"""
+        mutation = '''
+        mutation {
+          createContact(input: {nombre: "Ana", email: "ana@test.com", mensaje: "Tengo un problema urgente"}) {
+            success
+            contact { id categoria }
+          }
+        }
+        '''
+        data = client.post("/graphql", json={"query": mutation}).json()["data"]["createContact"]
+        
+        assert data["success"] is True
+        assert data["contact"]["categoria"] == "SOPORTE"
+        assert client.get("/api/v1/stats").json()["categories"]["soporte"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_create_contact_mutation_async(self, async_client, db_session):
+        """Test que el cliente async escribe en la BD de prueba a través del writer"""
+        mutation = '''
+        mutation {
+          createContact(input: {nombre: "Ana", email: "ana@test.com", mensaje: "Quisiera saber el precio"}) {
+            success
+          }
+        }
+        '''
+        response = await async_client.post("/graphql", json={"query": mutation})
+        
+        assert response.json()["data"]["createContact"]["success"] is True
+        assert db_session.query(ContactDB).filter_by(email="ana@test.com").count() == 1
+
+class TestConcurrencyLimit:
+    """Tests para el límite de peticiones simultáneas"""
+    
+    @pytest.mark.asyncio
+    async def test_rejects_requests_over_limit(self):
+        """Test que por encima del límite se responde 429 con Retry-After"""
+        release = asyncio.Event()
+        app = FastAPI()
+        app.add_middleware(ConcurrencyLimitMiddleware, max_concurrent=1)
+        
+        @app.get("/slow")
+        async def slow():
+            await release.wait()
+            return {"ok": True}
+        
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            first = asyncio.create_task(ac.get("/slow"))
+            await asyncio.sleep(0.05)
+            
+            rejected = await ac.get("/slow")
+            release.set()
+            
+            assert rejected.status_code == 429
+            assert rejected.headers["retry-after"] == "1"
+            assert (await first).status_code == 200
+            assert (await ac.get("/slow")).status_code == 200
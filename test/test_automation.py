@@ -0,0 +1,82 @@
+import smtplib
+from unittest import mock
+
+from services.automation import AutomationService
+
+class FakeSMTP:
+    """Sesión SMTP en memoria que falla a partir de cierto número de envíos"""
+    
+    def __init__(self, fail_after: int):
+        self.fail_after = fail_after
+        self.sent = 0
+        self.attempts = 0
+    
+    def send_message(self, msg):
+        self.attempts += 1
+        if self.attempts > self.fail_after:
+            raise smtplib.SMTPDataError(451, b"Rate limit")
+        self.sent += 1
+    
+    def quit(self):
+        pass
+
+class TestSalesEmailBatch:
+    """Tests para el envío agrupado de emails de ventas"""
+    
+    def test_batch_reuses_session(self):
+        """Test que todo el lote se envía por la misma sesión"""
+        service = AutomationService()
+        service._smtp = FakeSMTP(fail_after=100)
+        
+        results = service._send_smtp_batch([object()] * 10)
+        
+        assert results == [None] * 10
+        assert service._smtp.sent == 10
+    
+    def test_batch_aborts_when_a_third_fails(self):
+        """Test que un lote grande se aborta cuando falla más de un tercio"""
+        service = AutomationService()
+        service._smtp = FakeSMTP(fail_after=0)
+        
+        results = service._send_smtp_batch([object()] * 30, abort_min_batch=30)
+        
+        assert all(isinstance(r, Exception) for r in results)
+        assert service._smtp.attempts == 11
+    
+    def test_small_batch_is_not_aborted(self):
+        """Test que un lote pequeño intenta todos los envíos"""
+        service = AutomationService()
+        service._smtp = FakeSMTP(fail_after=0)
+        
+        service._send_smtp_batch([object()] * 5, abort_min_batch=30)
+        
+        assert service._smtp.attempts == 5
+
+class TestSMTPSession:
+    """Tests para la sesión SMTP persistente con smtplib.SMTP simulado"""
+    
+    def test_reconnects_once_when_server_disconnects(self):
+        """Test que una desconexión por inactividad reconecta y reenvía"""
+        stale, fresh = mock.MagicMock(), mock.MagicMock()
+        stale.send_message.side_effect = smtplib.SMTPServerDisconnected()
+        service = AutomationService()
+        
+        with mock.patch("smtplib.SMTP", side_effect=[stale, fresh]) as smtp_class:
+            results = service._send_smtp_batch([object()] * 3)
+        
+        assert results == [None] * 3
+        assert smtp_class.call_count == 2
+        stale.close.assert_called_once()
+        assert fresh.send_message.call_count == 3
+        fresh.login.assert_called_once()
+    
+    def test_unreachable_server_connects_once_per_batch(self):
+        """Test que con el servidor caído el lote no intenta conectar por cada mensaje"""
+        service = AutomationService()
+        
+        with mock.patch("smtplib.SMTP", side_effect=ConnectionRefusedError()) as smtp_class:
+            results = service._send_smtp_batch([object()] * 50)
+        
+        assert smtp_class.call_count == 1
+        assert all(isinstance(r, Exception) for r in results)
+        assert service._smtp is None
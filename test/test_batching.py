@@ -0,0 +1,37 @@
+import pytest
+import asyncio
+
+from services.batching import AsyncBatcher
+
+class SlowBatcher(AsyncBatcher):
+    """Batcher que se queda esperando hasta que se libera el evento"""
+
+    def __init__(self):
+        super().__init__(max_batch_size=4, max_latency_ms=1)
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def process_batch(self, items):
+        self.started.set()
+        await self.release.wait()
+        return items
+
+class TestAsyncBatcher:
+    """Tests para el micro-batching genérico"""
+
+    def test_requires_process_batch(self):
+        """Test que AsyncBatcher es abstracto"""
+        with pytest.raises(TypeError):
+            AsyncBatcher()
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_in_flight_batch(self):
+        """Test que al detener el worker no quedan requests esperando"""
+        batcher = SlowBatcher()
+        pending = asyncio.ensure_future(batcher.submit("a"))
+        await batcher.started.wait()
+
+        await batcher.stop()
+
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(pending, timeout=1)
@@ -0,0 +1,103 @@
+import pytest
+import asyncio
+
+from services.classifier import MessageClassifier, BatchClassifier
+
+MENSAJES = [
+    "Hola, me interesa conocer más sobre sus servicios de desarrollo web",
+    "Tengo un problema urgente con mi sistema, necesito ayuda técnica",
+    "Quisiera saber cuánto cuesta sus servicios y obtener una cotización",
+    "Buenas tardes, solo quería saludar al equipo",
+    "My app is BROKEN and not working, please help",
+]
+
+class TestMessageClassifier:
+    """Tests para el clasificador de mensajes"""
+    
+    def test_classify_message_categories(self):
+        """Test clasificación de mensajes típicos"""
+        classifier = MessageClassifier()
+        
+        assert classifier.classify_message(MENSAJES[0]) == "ventas"
+        assert classifier.classify_message(MENSAJES[1]) == "soporte"
+        assert classifier.classify_message(MENSAJES[2]) == "ventas"
+        assert classifier.classify_message(MENSAJES[3]) == "otro"
+    
+    def test_classify_messages_matches_single(self):
+        """Test que la clasificación por lotes coincide con la individual"""
+        classifier = MessageClassifier()
+        
+        expected = [classifier.classify_message(m) for m in MENSAJES]
+        assert classifier.classify_messages(MENSAJES) == expected
+
+    def test_repeated_message_uses_cache(self):
+        """Test que un mensaje repetido no se vuelve a puntuar"""
+        classifier = MessageClassifier(cache_size=8)
+
+        first = classifier.classify_message(MENSAJES[1])
+        calls = []
+        classifier._compute_scores = lambda message: calls.append(message)
+        assert classifier.classify_message(MENSAJES[1].upper()) == first
+        assert calls == []
+
+    def test_cache_does_not_keep_message_text(self):
+        """Test que la caché guarda un digest fijo y no el mensaje completo"""
+        classifier = MessageClassifier(cache_size=2)
+
+        for message in MENSAJES:
+            classifier.classify_message(message * 1000)
+
+        assert len(classifier._score_cache) == 2
+        assert all(len(key) == 16 for key in classifier._score_cache)
+
+    def test_instances_share_compiled_matcher(self):
+        """Test que el autómata se compila una sola vez para las mismas listas"""
+        assert MessageClassifier()._pattern is MessageClassifier()._pattern
+
+class TestBatchClassifier:
+    """Tests para el clasificador con micro-batching"""
+    
+    @pytest.mark.asyncio
+    async def test_submit_concurrent_messages(self):
+        """Test que los mensajes concurrentes se agrupan y resuelven en orden"""
+        classifier = MessageClassifier()
+        batch_classifier = BatchClassifier(classifier, max_batch_size=8, max_latency_ms=20)
+        
+        try:
+            results = await asyncio.gather(*(batch_classifier.submit(m) for m in MENSAJES))
+        finally:
+            await batch_classifier.stop()
+        
+        assert results == classifier.classify_messages(MENSAJES)
+
+class TestKeywordMatching:
+    """Tests para el emparejamiento precompilado de palabras clave"""
+    
+    @pytest.mark.parametrize("message", [
+        "el costo del producto",
+        "es urgente, no funciona y está roto",
+        "cuánto cuesta? quisiera saber el precio en $",
+        "my laptop is broken, not working, need urgent help to fix it",
+        "sin coincidencias aquí",
+    ])
+    def test_scores_match_substring_semantics(self, message):
+        """Test que las puntuaciones coinciden con evaluar `kw in message` por palabra"""
+        classifier = MessageClassifier()
+        matches = classifier._find_matches(message)
+        
+        for group, keywords in [
+            ("sales_keywords", classifier.sales_keywords),
+            ("support_keywords", classifier.support_keywords),
+            ("sales_patterns", classifier.sales_patterns),
+            ("support_patterns", classifier.support_patterns),
+        ]:
+            expected = {kw for kw in keywords if kw in message}
+            assert {kw for match_group, kw in matches if match_group == group} == expected
+        
+        def count(keywords):
+            return sum(1 for kw in keywords if kw in message)
+        
+        assert classifier._compute_scores(message) == (
+            count(classifier.sales_keywords) + 2 * count(classifier.sales_patterns),
+            count(classifier.support_keywords) + 2 * count(classifier.support_patterns)
+        )
@@ -0,0 +1,47 @@
+import pytest
+import asyncio
+from sqlalchemy.exc import IntegrityError
+
+from models.database import ContactDB
+from services.contact_writer import ContactWriter
+
+class TestContactWriter:
+    """Tests para las inserciones agrupadas de contactos"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_submits_share_batch(self, db_session, session_factory):
+        """Test que los contactos concurrentes se insertan y cada request recibe su fila"""
+        writer = ContactWriter(session_factory, max_batch_size=8, max_latency_ms=20)
+        contacts = [
+            {"nombre": f"Usuario {i}", "email": f"user{i}@test.com", "mensaje": f"Mensaje {i}", "categoria": "otro"}
+            for i in range(5)
+        ]
+        
+        try:
+            results = await asyncio.gather(*(writer.submit(c) for c in contacts))
+        finally:
+            await writer.stop()
+        
+        assert [r.nombre for r in results] == [c["nombre"] for c in contacts]
+        assert len({r.id for r in results}) == 5
+        assert all(r.fecha_creacion is not None for r in results)
+        assert db_session.query(ContactDB).count() == 5
+    
+    @pytest.mark.asyncio
+    async def test_invalid_row_only_fails_its_request(self, db_session, session_factory):
+        """Test que una fila inválida no hace fallar al resto del lote"""
+        writer = ContactWriter(session_factory, max_batch_size=8, max_latency_ms=20)
+        contacts = [
+            {"nombre": f"Usuario {i}", "email": f"user{i}@test.com", "mensaje": f"Mensaje {i}", "categoria": "otro"}
+            for i in range(4)
+        ]
+        contacts[2]["nombre"] = None
+        
+        try:
+            results = await asyncio.gather(*(writer.submit(c) for c in contacts), return_exceptions=True)
+        finally:
+            await writer.stop()
+        
+        assert isinstance(results[2], IntegrityError)
+        assert [r.nombre for i, r in enumerate(results) if i != 2] == ["Usuario 0", "Usuario 1", "Usuario 3"]
+        assert db_session.query(ContactDB).count() == 3
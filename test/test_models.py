@@ -24,7 +24,29 @@ class TestContactSchemas:
             ContactCreate(**sample_contact_data)
         
         assert "value is not a valid email address" in str(exc_info.value)
-    
+
+    @pytest.mark.parametrize("email, expected", [
+        ("Juan.Perez@Test.COM", "Juan.Perez@test.com"),
+        ("  juan@test.com ", "juan@test.com"),
+        ("Juan <juan@test.com>", "juan@test.com"),
+        ("a@xn--bcher-kva.com", "a@bücher.com"),
+    ])
+    def test_contact_create_email_normalized(self, sample_contact_data, email, expected):
+        """Test que el email se normaliza igual que EmailStr (dominio en minúsculas)"""
+        sample_contact_data["email"] = email
+
+        assert ContactCreate(**sample_contact_data).email == expected
+
+    @pytest.mark.parametrize("email", [
+        "juan..perez@test.com", "juan@servidor.local", "juan@-test.com", "juan@xn--zz.com", "juan@ab--c.com"
+    ])
+    def test_contact_create_email_rejected(self, sample_contact_data, email):
+        """Test que las direcciones que EmailStr rechaza siguen siendo inválidas"""
+        sample_contact_data["email"] = email
+
+        with pytest.raises(ValidationError):
+            ContactCreate(**sample_contact_data)
+
     def test_contact_create_short_name(self, sample_contact_data):
         """Test con nombre muy corto"""
         sample_contact_data["nombre"] = "A"
@@ -34,6 +56,21 @@ class TestContactSchemas:
         
         assert "al menos 2 caracteres" in str(exc_info.value)
     
+    def test_contact_create_long_name(self, sample_contact_data):
+        """Test con nombre más largo que la columna"""
+        sample_contact_data["nombre"] = "A" * 101
+        
+        with pytest.raises(ValidationError) as exc_info:
+            ContactCreate(**sample_contact_data)
+        
+        assert "hasta 100 caracteres" in str(exc_info.value)
+    
+    def test_contact_create_padded_long_name(self, sample_contact_data):
+        """Test que el límite del nombre se aplica tras quitar espacios, como en GraphQL"""
+        sample_contact_data["nombre"] = "  " + "A" * 100 + "  "
+        
+        assert ContactCreate(**sample_contact_data).nombre == "A" * 100
+    
     def test_contact_create_short_message(self, sample_contact_data):
         """Test con mensaje muy corto"""
         sample_contact_data["mensaje"] = "Hola"